@@ -0,0 +1,75 @@
+"""Synthetic data generators for the benchmark suite.
+
+Output is deterministic for a given seed and matches the shapes the app
+produces: formulary entries look like the QR Code Generator's ``qr_data``
+and survey rows look like the Patient Survey's ``survey_data``.
+"""
+import random
+from datetime import datetime, timedelta
+
+MEDICATIONS = [
+    "Amoxicillin", "Metformin", "Atorvastatin", "Lisinopril", "Levothyroxine",
+    "Amlodipine", "Omeprazole", "Ibuprofen", "Warfarin", "Salbutamol",
+    "Sertraline", "Prednisolone", "Paracetamol", "Clopidogrel", "Insulin Glargine",
+]
+STRENGTHS = ["5mg", "10mg", "20mg", "40mg", "100mg", "250mg", "500mg", "1g", "100 units/mL"]
+FREQUENCIES = ["Once daily", "Twice daily", "Three times daily", "Every 8 hours", "As needed"]
+INSTRUCTIONS = [
+    "Take with food",
+    "Take on an empty stomach, 30 minutes before breakfast",
+    "Avoid alcohol",
+    "Do not crush or chew",
+    "Complete the full course even if you feel better",
+    "",
+]
+
+AGE_GROUPS = ["18-30", "31-50", "51-65", "65+"]
+EDUCATION = ["High School", "Bachelor's", "Master's", "Doctorate", "Other"]
+METHODS = ["Traditional Leaflet", "QR Code + Chatbot", "Both"]
+PREFERRED = ["Traditional Paper Leaflet", "QR Code with Digital Info",
+             "AI Chatbot Support", "Combination of Digital Methods"]
+RECOMMEND = ["Yes", "No", "Maybe"]
+
+_EPOCH = datetime(2025, 1, 1)
+
+
+def formulary(rows, seed=0):
+    """Return ``rows`` medication entries shaped like the QR generator payload"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(rows):
+        entry = {
+            "medication": rng.choice(MEDICATIONS),
+            "dosage": rng.choice(STRENGTHS),
+            "frequency": rng.choice(FREQUENCIES),
+            "instructions": rng.choice(INSTRUCTIONS),
+            "generated": (_EPOCH + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if rng.random() < 0.8:
+            entry["chatbot"] = "enabled"
+        if rng.random() < 0.3:
+            entry["url"] = f"https://med-info.example.org/{entry['medication'].lower().replace(' ', '-')}"
+        entries.append(entry)
+    return entries
+
+
+def survey_responses(rows, seed=0):
+    """Return ``rows`` survey responses shaped like the Patient Survey output"""
+    rng = random.Random(seed)
+    responses = []
+    for i in range(rows):
+        responses.append({
+            "timestamp": (_EPOCH + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "patient_id": f"P{i + 1:03d}",
+            "age_group": rng.choice(AGE_GROUPS),
+            "education": rng.choice(EDUCATION),
+            "method_used": rng.choice(METHODS),
+            "tech_comfort": rng.randint(1, 5),
+            "understanding": rng.randint(1, 10),
+            "satisfaction": rng.randint(1, 10),
+            "adherence_confidence": rng.randint(1, 10),
+            "prefer_method": rng.choice(PREFERRED),
+            "would_recommend": rng.choice(RECOMMEND),
+            "feedback": "",
+        })
+    return responses
@@ -0,0 +1,101 @@
+"""Instrumentation overhead check for QRcode.py.
+
+Times full Home-page reruns with Streamlit's AppTest, alternating metrics
+off and on, and fails when enabling metrics costs ``--budget`` (default 1%)
+or more of a rerun. The median of the paired (on - off) differences cancels
+out slow drift on a busy machine. By default the sidebar metrics panel
+follows ``QRCODE_METRICS_PANEL`` (off unless set); ``--panel`` measures with
+it shown. Runs fully offline.
+
+Usage:
+    python benchmarks/metrics_overhead.py
+    python benchmarks/metrics_overhead.py --reruns 200 --panel --output overhead.json
+
+Exits with status 1 when the measured overhead is at or above the budget.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "QRcode.py")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+# Let the metrics endpoint pick a free port when the first enabled rerun starts it
+os.environ.setdefault("QRCODE_METRICS_PORT", "0")
+
+import metrics  # noqa: E402
+
+
+def measure(reruns=100, panel=None):
+    """Time Home-page reruns alternating metrics off and on.
+
+    Returns the median rerun time in each mode, the median of the paired
+    (on - off) differences and that difference as a fraction of a rerun.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # Streamlit logs a deprecation warning on every rerun
+    logging.disable(logging.WARNING)
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.run()
+
+    timings = {False: [], True: []}
+    previous = metrics.ENABLED, metrics.PANEL
+    if panel is not None:
+        metrics.PANEL = panel
+    try:
+        for i in range(reruns):
+            for enabled in ((False, True) if i % 2 else (True, False)):
+                metrics.ENABLED = enabled
+                started = time.perf_counter()
+                app.run()
+                timings[enabled].append(time.perf_counter() - started)
+    finally:
+        panel_shown = metrics.PANEL
+        metrics.ENABLED, metrics.PANEL = previous
+    off = statistics.median(timings[False])
+    paired = statistics.median(on - off for off, on in zip(timings[False], timings[True]))
+    return {
+        "reruns": reruns,
+        "panel": panel_shown,
+        "off_median_s": off,
+        "on_median_s": statistics.median(timings[True]),
+        "paired_delta_s": paired,
+        "overhead": paired / off,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the cost of enabling instrumentation.")
+    parser.add_argument("--reruns", type=int, default=100,
+                        help="paired Home-page reruns to time (default: 100)")
+    parser.add_argument("--budget", type=float, default=0.01,
+                        help="fail when overhead reaches this fraction of a rerun (default: 0.01)")
+    parser.add_argument("--panel", action="store_true",
+                        help="show the sidebar metrics panel while measuring")
+    parser.add_argument("--output", help="also write the result to this JSON file")
+    args = parser.parse_args(argv)
+
+    result = measure(args.reruns, panel=True if args.panel else None)
+    result["budget"] = args.budget
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    panel = "shown" if result["panel"] else "hidden"
+    print(f"Metrics overhead on a Home-page rerun, panel {panel}: {result['paired_delta_s'] * 1000:+.3f} ms "
+          f"on {result['off_median_s'] * 1000:.2f} ms ({result['overhead']:+.2%}, "
+          f"median of {args.reruns} paired reruns)")
+    if result["overhead"] >= args.budget:
+        print(f"Overhead is at or above the {args.budget:.0%} budget")
+        return 1
+    print(f"Within the {args.budget:.0%} budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,427 @@
+"""Micro-benchmarks for the platform's hot paths.
+
+Measures latency, throughput and peak memory of QR generation, QR payload
+encoding, the analytics DataFrame/plotly pipeline and the CSV/JSON exports
+on synthetic data, and compares the results against a stored JSON baseline.
+The app_rerun case times a full Home-page rerun of QRcode.py with metrics
+disabled; the cost of enabling them is checked by metrics_overhead.py. Runs
+fully offline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline      # record a new baseline
+    python benchmarks/run_benchmarks.py --max-rows 1000000   # include the 1M-row cases
+    python benchmarks/run_benchmarks.py --only export_csv --threshold 0.1
+
+Peak memory is the growth in resident set size (RSS) during one run of the
+workload, measured in a fresh subprocess per case after a warm-up run, with
+freed memory handed back to the OS first (glibc ``malloc_trim`` and Arrow's
+pool) so the measured run cannot hide in it. Being RSS, it covers everything
+the run touches: Python objects, pandas' Arrow buffers, Pillow image buffers
+and allocator overhead. It does not include the case's input data, which is
+built before the measurement. On Linux the kernel's peak counter is reset
+just before the run; elsewhere only growth of the process's lifetime peak is
+seen, which can read low. The median of ``--memory-runs`` subprocesses is
+reported.
+
+The baseline holds absolute numbers from one machine, so the run first
+compares its environment (Python, CPU, package versions) with the one stored
+in the baseline. If they differ it prints what changed and reports
+regressions without failing; pass ``--force`` to gate anyway.
+
+Exits with status 1 when any case's median latency, or its peak memory,
+exceeds the baseline by more than ``--threshold`` (a fraction, default 0.25).
+Latency also gets a per-case noise allowance of three median absolute
+deviations of the baseline's samples; memory gets a fixed allowance of
+``MEMORY_NOISE_BYTES`` for page-level jitter. Cases that look slower are
+measured again, and the gate decides on the median of both sample sets.
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib.metadata import version
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "QRcode.py")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import helpers  # noqa: E402
+from generators import formulary, survey_responses  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+LARGE_SIZES = (10, 1_000, 100_000, 1_000_000)
+# Each timed sample repeats the workload until it takes at least this long
+MIN_SAMPLE_SECONDS = 0.2
+# Peak RSS of the same run varies by a few pages between processes
+MEMORY_NOISE_BYTES = 256 * 1024
+PACKAGES = ("pandas", "pyarrow", "plotly", "qrcode", "pillow", "streamlit")
+# Environment fields that must match the baseline for its numbers to apply
+GATED_ENVIRONMENT = ("python", "machine", "cpu", "cpu_count") + PACKAGES
+
+
+def _qr_generate(rows):
+    payloads = [helpers.encode_qr_payload(entry) for entry in formulary(rows)]
+    return lambda: [helpers.generate_qr_code(payload) for payload in payloads]
+
+def _qr_payload(rows):
+    entries = formulary(rows)
+    return lambda: [helpers.encode_qr_payload(entry) for entry in entries]
+
+def _analytics_dataframe(rows):
+    responses = survey_responses(rows)
+    return lambda: helpers.survey_dataframe(responses)
+
+def _analytics_figures(rows):
+    df = helpers.survey_dataframe(survey_responses(rows))
+    return lambda: helpers.build_survey_figures(df)
+
+def _export_csv(rows):
+    df = helpers.survey_dataframe(survey_responses(rows))
+    return lambda: helpers.export_csv(df)
+
+def _export_json(rows):
+    df = helpers.survey_dataframe(survey_responses(rows))
+    return lambda: helpers.export_json(df)
+
+def _app_test():
+    from streamlit.testing.v1 import AppTest
+
+    # Streamlit logs a deprecation warning on every rerun
+    logging.disable(logging.WARNING)
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.run()
+    return app
+
+def _app_rerun(rows):
+    app = _app_test()
+
+    def workload():
+        for _ in range(rows):
+            app.run()
+    return workload
+
+
+# name -> (setup(rows) returning the workload callable, row counts)
+BENCHMARKS = {
+    # One PNG per formulary entry (~30 ms each), so this path stays small
+    "qr_generate": (_qr_generate, (1, 10, 100)),
+    "qr_payload": (_qr_payload, LARGE_SIZES),
+    "analytics_dataframe": (_analytics_dataframe, LARGE_SIZES),
+    "analytics_figures": (_analytics_figures, LARGE_SIZES),
+    "export_csv": (_export_csv, LARGE_SIZES),
+    "export_json": (_export_json, LARGE_SIZES),
+    # Rows here are app reruns, with metrics disabled
+    "app_rerun": (_app_rerun, (1,)),
+}
+
+
+def measure(workload, rows, repeats):
+    """Time ``workload``"""
+    # The warm-up run also sizes each sample
+    started = time.perf_counter()
+    workload()
+    single = time.perf_counter() - started
+    number = max(1, int(MIN_SAMPLE_SECONDS / single) if single > 0 else 1)
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(number):
+                workload()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return summarise(rows, number, samples)
+
+
+def summarise(rows, loops, samples):
+    """Build a result record from per-run latency samples"""
+    median = statistics.median(samples)
+    return {
+        "rows": rows,
+        "repeats": len(samples),
+        "loops": loops,
+        "median_s": median,
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "samples_s": samples,
+        "throughput_rows_per_s": rows / median if median else None,
+    }
+
+
+def _proc_status(field):
+    """A memory field of /proc/self/status in bytes, or None where it is unavailable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _release_free_memory():
+    """Hand freed heap and Arrow pool memory back to the OS"""
+    if "pyarrow" in sys.modules:
+        sys.modules["pyarrow"].default_memory_pool().release_unused()
+    libc = ctypes.util.find_library("c")
+    try:
+        ctypes.CDLL(libc).malloc_trim(0)
+    except (OSError, AttributeError, TypeError):
+        pass
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak RSS counter (VmHWM); return False where unsupported"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return _proc_status("VmHWM") is not None
+
+
+def _max_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_growth(workload):
+    """Peak RSS added by one run of ``workload`` after a warm-up run, in bytes"""
+    # The warm-up run does lazy imports and fills caches
+    workload()
+    gc.collect()
+    _release_free_memory()
+    if _reset_peak_rss():
+        before = _proc_status("VmRSS")
+        workload()
+        return max(0, _proc_status("VmHWM") - before)
+    before = _max_rss()
+    workload()
+    return max(0, _max_rss() - before)
+
+
+def memory_probe(name, rows):
+    """Set up one case in this process and return its peak RSS growth"""
+    setup, _ = BENCHMARKS[name]
+    return peak_rss_growth(setup(rows))
+
+
+def measure_memory(name, rows, runs):
+    """Run ``memory_probe`` in ``runs`` fresh subprocesses; return the samples"""
+    samples = []
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, os.path.abspath(__file__), "--memory-probe", name, str(rows)],
+                               capture_output=True, text=True, check=True)
+        samples.append(int(probe.stdout.split()[-1]))
+    return samples
+
+
+def noise_allowance(samples):
+    """Three median absolute deviations of ``samples``, in seconds"""
+    if not samples:
+        return 0.0
+    median = statistics.median(samples)
+    return 3 * statistics.median(abs(sample - median) for sample in samples)
+
+
+def run_case(name, rows, repeats, memory_runs):
+    """Set up and measure a single benchmark case"""
+    setup, _ = BENCHMARKS[name]
+    workload = setup(rows)
+    result = measure(workload, rows, repeats)
+    del workload
+    gc.collect()
+    memory = measure_memory(name, rows, memory_runs)
+    result["peak_memory_bytes"] = statistics.median(memory)
+    result["memory_samples_bytes"] = memory
+    print(f"{name:<22}{rows:>10,} rows  {result['median_s'] * 1000:>12.3f} ms  "
+          f"{result['throughput_rows_per_s']:>14,.0f} rows/s  "
+          f"{result['peak_memory_bytes'] / 1024:>12,.1f} KiB", flush=True)
+    return result
+
+
+def run(names, max_rows, repeats, memory_runs):
+    results = {}
+    for name in names:
+        _, sizes = BENCHMARKS[name]
+        for rows in sizes:
+            if rows <= max_rows:
+                results[f"{name}/{rows}"] = run_case(name, rows, repeats, memory_runs)
+    return results
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment():
+    return {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        **{package: version(package) for package in PACKAGES},
+    }
+
+
+def environment_differences(current, recorded):
+    """Return ``(field, recorded, current)`` for gated fields that differ"""
+    return [(field, recorded.get(field), current.get(field)) for field in GATED_ENVIRONMENT
+            if recorded.get(field) != current.get(field)]
+
+
+def compare(results, baseline, threshold):
+    """Return regressions against ``baseline`` as ``(key, kind, message)`` tuples
+
+    ``kind`` is ``"latency"`` or ``"memory"``. Latency compares median with
+    median. The limit is the baseline median scaled by ``threshold`` plus that
+    case's noise allowance. The memory limit is the baseline peak scaled by
+    ``threshold`` plus ``MEMORY_NOISE_BYTES``.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        old, new = previous.get("median_s"), current.get("median_s")
+        if old and new is not None:
+            limit = old * (1 + threshold) + noise_allowance(previous.get("samples_s", []))
+            if new > limit:
+                regressions.append((key, "latency", f"median latency {old * 1000:.3f} ms -> {new * 1000:.3f} ms "
+                                                    f"({(new - old) / old:+.0%}, limit {limit * 1000:.3f} ms)"))
+        old, new = previous.get("peak_memory_bytes"), current.get("peak_memory_bytes")
+        if old is not None and new is not None:
+            limit = old * (1 + threshold) + MEMORY_NOISE_BYTES
+            if new > limit:
+                regressions.append((key, "memory", f"peak memory {old / 1024:,.1f} KiB -> {new / 1024:,.1f} KiB "
+                                                   f"(limit {limit / 1024:,.1f} KiB)"))
+    return regressions
+
+
+def write_output(path, report):
+    if path:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the platform micro-benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), metavar="NAME",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--max-rows", type=int, default=100_000,
+                        help="skip cases larger than this many rows (default: 100000)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed samples per case (default: 5)")
+    parser.add_argument("--memory-runs", type=int, default=3,
+                        help="fresh subprocesses per case for peak memory (default: 3)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed fractional regression before failing (default: 0.25)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write results to the baseline file instead of comparing")
+    parser.add_argument("--output", help="also write results to this JSON file")
+    parser.add_argument("--force", action="store_true",
+                        help="fail on regressions even if the environment differs from the baseline's")
+    # Internal: measure one case's memory in this process (used by measure_memory)
+    parser.add_argument("--memory-probe", nargs=2, metavar=("NAME", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.memory_probe:
+        name, rows = args.memory_probe
+        print(memory_probe(name, int(rows)))
+        return 0
+
+    results = run(args.only or list(BENCHMARKS), args.max_rows, args.repeats, args.memory_runs)
+    report = {"environment": environment(), "results": results}
+
+    if args.save_baseline:
+        baseline = {"environment": report["environment"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline["results"] = json.load(f).get("results", {})
+        baseline["results"].update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        write_output(args.output, report)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        write_output(args.output, report)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    differences = environment_differences(report["environment"], baseline.get("environment", {}))
+    if differences:
+        print(f"\nWarning: this environment differs from the baseline's, so its timings and memory "
+              f"are not comparable:")
+        for field, recorded, current in differences:
+            print(f"  {field}: {recorded} -> {current}")
+        print("Regressions are reported but do not fail the run; pass --force to gate anyway, "
+              "or --save-baseline to record a baseline for this environment.")
+    report["environment_differences"] = [{"field": field, "baseline": recorded, "current": current}
+                                         for field, recorded, current in differences]
+    missing = sorted(key for key in results if key not in baseline.get("results", {}))
+    if missing:
+        print(f"\nWarning: no baseline for {len(missing)} case(s), not checked: {', '.join(missing)}")
+
+    suspects = {key for key, kind, _ in compare(results, baseline, args.threshold) if kind == "latency"}
+    if suspects:
+        # Re-measure and decide on the median of both sample sets, so one
+        # noisy run neither fails nor passes the gate on its own
+        print(f"\nRe-measuring {len(suspects)} case(s) that look slower than the baseline")
+        for key in sorted(suspects):
+            name, rows = key.rsplit("/", 1)
+            first = results[key]
+            retry = measure(BENCHMARKS[name][0](int(rows)), int(rows), args.repeats)
+            results[key] = {**first, **summarise(first["rows"], first["loops"],
+                                                 first["samples_s"] + retry["samples_s"])}
+            print(f"{name:<22}{int(rows):>10,} rows  {retry['median_s'] * 1000:>12.3f} ms  "
+                  f"(median of both runs {results[key]['median_s'] * 1000:.3f} ms)", flush=True)
+    regressions = compare(results, baseline, args.threshold)
+    report["regressions"] = [{"case": key, "kind": kind, "message": message}
+                             for key, kind, message in regressions]
+    write_output(args.output, report)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for key, _, message in regressions:
+            print(f"  {key}: {message}")
+        if differences and not args.force:
+            print("Not failing: the environment differs from the baseline's (see above).")
+            return 0
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Helper functions for the Smart Medication Education Platform.
+
+These do not touch Streamlit, so the benchmark suite can import and time
+exactly the code the app runs.
+"""
+import base64
+import json
+from io import BytesIO
+
+import pandas as pd
+import plotly.express as px
+import qrcode
+
+import metrics
+
+
+@metrics.timed()
+def generate_qr_code(data):
+    """Generate QR code from data"""
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+@metrics.timed()
+def get_image_download_link(img_buffer, filename):
+    """Generate download link for QR code"""
+    b64 = base64.b64encode(img_buffer.getvalue()).decode()
+    return f'<a href="data:image/png;base64,{b64}" download="{filename}">📥 Download QR Code</a>'
+
+def encode_qr_payload(qr_data):
+    """Serialize medication data into the text embedded in a QR code"""
+    with metrics.span("qr_payload_encode"):
+        return json.dumps(qr_data, indent=2)
+
+def survey_dataframe(responses):
+    """Build the analytics DataFrame from survey responses"""
+    with metrics.span("analytics_dataframe"):
+        return pd.DataFrame(responses)
+
+def build_survey_figures(df):
+    """Build the Data Analytics charts, keyed by chart name"""
+    figures = {}
+
+    # Understanding by method
+    with metrics.span("plotly_figure", chart="understanding"):
+        figures["understanding"] = px.box(
+            df, x="method_used", y="understanding",
+            title="Understanding Score by Method",
+            color="method_used",
+            labels={"understanding": "Understanding (1-10)", "method_used": "Method Used"}
+        )
+
+    # Satisfaction by method
+    with metrics.span("plotly_figure", chart="satisfaction"):
+        figures["satisfaction"] = px.box(
+            df, x="method_used", y="satisfaction",
+            title="Satisfaction Score by Method",
+            color="method_used",
+            labels={"satisfaction": "Satisfaction (1-10)", "method_used": "Method Used"}
+        )
+
+    # Adherence confidence comparison
+    with metrics.span("plotly_figure", chart="adherence"):
+        figures["adherence"] = px.violin(
+            df, x="method_used", y="adherence_confidence",
+            title="Adherence Confidence by Method",
+            color="method_used",
+            box=True,
+            labels={"adherence_confidence": "Adherence Confidence (1-10)", "method_used": "Method Used"}
+        )
+
+    # Age distribution
+    with metrics.span("plotly_figure", chart="age"):
+        age_counts = df['age_group'].value_counts()
+        figures["age"] = px.pie(values=age_counts.values, names=age_counts.index,
+                                title="Age Group Distribution")
+
+    # Tech comfort by age
+    with metrics.span("plotly_figure", chart="tech_comfort"):
+        figures["tech_comfort"] = px.box(df, x="age_group", y="tech_comfort",
+                                         title="Technology Comfort by Age Group",
+                                         color="age_group")
+
+    # Preferred method
+    with metrics.span("plotly_figure", chart="prefer_method"):
+        prefer_counts = df['prefer_method'].value_counts()
+        figures["prefer_method"] = px.bar(x=prefer_counts.index, y=prefer_counts.values,
+                                          title="Preferred Information Method",
+                                          labels={"x": "Method", "y": "Count"})
+        figures["prefer_method"].update_layout(showlegend=False)
+
+    # Recommendation rate
+    with metrics.span("plotly_figure", chart="would_recommend"):
+        recommend_counts = df['would_recommend'].value_counts()
+        figures["would_recommend"] = px.pie(values=recommend_counts.values, names=recommend_counts.index,
+                                            title="Would Recommend Digital Methods?")
+
+    return figures
+
+def export_csv(df):
+    """Export a DataFrame as CSV text"""
+    with metrics.span("export", format="csv"):
+        return df.to_csv(index=False)
+
+def export_json(df):
+    """Export a DataFrame as indented JSON records"""
+    with metrics.span("export", format="json"):
+        return df.to_json(orient="records", indent=2)
@@ -0,0 +1,143 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Serves ``POST /v1/messages`` with a canned pharmacy answer after a
+configurable delay, and fails a configurable fraction of requests with the
+same error bodies the real API returns. Point the app at it with
+``ANTHROPIC_BASE_URL=http://127.0.0.1:<port>``; the Anthropic client picks
+that up without code changes.
+
+Usage:
+    python loadtest/fake_anthropic.py --port 8765 --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "Take this medication exactly as prescribed. Common side effects include mild "
+    "nausea and headache. Store it at room temperature away from moisture. "
+    "Always consult your healthcare provider or pharmacist for personalized advice."
+)
+
+# (HTTP status, Anthropic error type) pairs returned on injected failures
+ERRORS = [
+    (529, "overloaded_error"),
+    (500, "api_error"),
+    (429, "rate_limit_error"),
+]
+
+
+class FakeAnthropicServer(ThreadingHTTPServer):
+    """Threaded HTTP server that answers Messages API calls"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=500.0, jitter_ms=100.0, error_rate=0.0, seed=None):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background daemon thread and return self"""
+        thread = threading.Thread(target=self.serve_forever, name="fake-anthropic", daemon=True)
+        thread.start()
+        return self
+
+    def next_outcome(self):
+        """Return (delay in seconds, error or None) for the next request"""
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            error = None
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                error = self.random.choice(ERRORS)
+        return delay, error
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path.split("?", 1)[0] != "/v1/messages":
+            self._send(404, {"type": "error", "error": {"type": "not_found_error", "message": "Not found"}})
+            return
+
+        delay, error = self.server.next_outcome()
+        time.sleep(delay)
+        if error:
+            status, error_type = error
+            self._send(status, {"type": "error", "error": {"type": error_type, "message": "Injected failure"}})
+            return
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            request = {}
+        prompt = "".join(
+            message.get("content", "") for message in request.get("messages", [])
+            if isinstance(message.get("content"), str)
+        )
+        self._send(200, {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "fake-model"),
+            "content": [{"type": "text", "text": REPLY}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": max(1, len(prompt) // 4), "output_tokens": len(REPLY) // 4},
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("request-id", f"req_{uuid.uuid4().hex[:24]}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local fake Anthropic Messages API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="latency standard deviation")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeAnthropicServer((args.host, args.port), args.latency_ms, args.jitter_ms,
+                                 args.error_rate, args.seed)
+    print(f"Fake Anthropic API listening on {server.url} (set ANTHROPIC_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Drives simulated pharmacy-counter sessions through QRcode.py with Streamlit's
+AppTest, each session picking pages from a weighted mix and interacting with
+them the way a user would. ``chat_with_claude`` talks to a local fake
+Anthropic server (see fake_anthropic.py), so no network access or API key is
+needed. For each concurrency level the harness reports p50/p95/p99 rerun
+latency, rerun throughput, fake-API failures, chatbot error replies and
+resident memory per session.
+Reruns that time out (``--timeout``) or page actions that fail are counted
+per level instead of stopping the run, and ``--output`` is rewritten after
+every level.
+
+The Anthropic client retries 429/5xx responses (twice by default) with
+backoff, so ``--error-rate`` applies per HTTP request: most injected failures
+show up as extra chatbot latency, and only those that exhaust the retries
+reach users as error replies.
+
+AppTest keeps global runtime state and cannot run several apps in one
+process, so each session runs in its own worker process. All sessions start
+together behind a barrier. Because of that, CPU-bound pages scale better here
+than in a single ``streamlit run`` server; API-bound pages are representative.
+
+Usage:
+    python loadtest/run_loadtest.py
+    python loadtest/run_loadtest.py --levels 1 4 16 32 --actions 20 \\
+        --mix chatbot=5,survey=3,generator=2,analytics=1 --latency-ms 1200 --error-rate 0.05
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_anthropic import FakeAnthropicServer  # noqa: E402
+from sessions import PAGES, init_worker, run_session  # noqa: E402
+
+DEFAULT_MIX = "chatbot=4,survey=3,generator=2,analytics=1"
+
+
+def parse_mix(text):
+    """Parse ``page=weight,...`` into a dict of page weights"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in PAGES:
+            raise argparse.ArgumentTypeError(f"unknown page {name!r}; choose from {', '.join(PAGES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # Multiply before dividing: pct / 100 * n rounds up past whole ranks, e.g. p28 of 25
+    rank = max(1, math.ceil(pct * len(ordered) / 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_level(concurrency, args, mix, server):
+    """Run ``concurrency`` sessions at once and summarise their reruns"""
+    requests_before, errors_before = server.requests, server.errors
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(concurrency)
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=context,
+                             initializer=init_worker, initargs=(barrier,)) as pool:
+        futures = [pool.submit(run_session, f"{args.seed}-{concurrency}-{i}", mix, args.actions, args.timeout)
+                   for i in range(concurrency)]
+        sessions, crashed = [], 0
+        for future in futures:
+            try:
+                sessions.append(future.result())
+            except Exception:
+                # A worker that dies takes its whole session with it
+                crashed += 1
+
+    wall = (max(s["finished"] for s in sessions) - min(s["started"] for s in sessions)) if sessions else 0.0
+    latencies = [latency for session in sessions for latency in session["latencies"]]
+    return {
+        "concurrency": concurrency,
+        "reruns": len(latencies),
+        "wall_s": wall,
+        "throughput_reruns_per_s": len(latencies) / wall if wall else None,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "app_exceptions": sum(session["exceptions"] for session in sessions),
+        "timed_out_reruns": sum(session["timeouts"] for session in sessions),
+        "failed_reruns": sum(session["failures"] for session in sessions),
+        "crashed_sessions": crashed,
+        "api_requests": server.requests - requests_before,
+        "api_errors": server.errors - errors_before,
+        "chat_replies": sum(session["chat_replies"] for session in sessions),
+        "chat_errors": sum(session["chat_errors"] for session in sessions),
+        "rss_per_session_kib": (sum(session["rss_bytes"] for session in sessions) / len(sessions) / 1024
+                                if sessions else 0.0),
+    }
+
+
+def write_output(args, results):
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "output"},
+                       "results": results}, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated sessions.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent session counts to test (default: 1 2 4 8)")
+    parser.add_argument("--actions", type=int, default=10, help="page visits per session (default: 10)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted page mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="fake API mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="fake API latency standard deviation")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of fake API HTTP requests that fail, before SDK retries")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    server = FakeAnthropicServer(("127.0.0.1", 0), args.latency_ms, args.jitter_ms,
+                                 args.error_rate, args.seed).start()
+    # Inherited by the worker processes; the Anthropic client reads it when
+    # chat_with_claude creates one
+    os.environ["ANTHROPIC_BASE_URL"] = server.url
+
+    print(f"Fake Anthropic API at {server.url}; mix {args.mix}; {args.actions} actions per session")
+    print("Latency includes Anthropic SDK retry backoff. 'api fail' = failed HTTP requests / all requests;")
+    print("'chat err' = error replies shown to users / chatbot replies.\n")
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'reruns/s':>9} {'api fail':>9} {'chat err':>9} {'KiB/session':>12}")
+    results = []
+    try:
+        for concurrency in args.levels:
+            result = run_level(concurrency, args, args.mix, server)
+            results.append(result)
+            # Written after every level so a later crash keeps finished levels
+            write_output(args, results)
+            print(f"{concurrency:>8} {result['reruns']:>7} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                  f"{result['p99_ms']:>9.1f} {result['throughput_reruns_per_s'] or 0.0:>9.2f} "
+                  f"{result['api_errors']:>5}/{result['api_requests']:<3} "
+                  f"{result['chat_errors']:>5}/{result['chat_replies']:<3} "
+                  f"{result['rss_per_session_kib']:>12,.0f}", flush=True)
+            if result["app_exceptions"]:
+                print(f"         {result['app_exceptions']} rerun(s) raised an exception in the app")
+            if result["timed_out_reruns"] or result["failed_reruns"]:
+                print(f"         {result['timed_out_reruns']} rerun(s) timed out after {args.timeout:g} s, "
+                      f"{result['failed_reruns']} failed in the harness")
+            if result["crashed_sessions"]:
+                print(f"         {result['crashed_sessions']} session(s) crashed")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Simulated user sessions for the load test.
+
+Kept apart from run_loadtest.py because AppTest replaces ``__main__`` in the
+worker processes, so anything the process pool pickles must live in an
+importable module.
+"""
+import logging
+import os
+import random
+import resource
+import sys
+import time
+import warnings
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "QRcode.py")
+
+PAGES = {
+    "home": "🏠 Home",
+    "generator": "🔗 QR Code Generator",
+    "chatbot": "🤖 AI Medication Chatbot",
+    "survey": "📊 Patient Survey",
+    "analytics": "📈 Data Analytics",
+    "patients": "👥 Patient Management",
+}
+QUESTIONS = [
+    "What are the side effects of ibuprofen?",
+    "How should I take metformin?",
+    "Can I take aspirin with warfarin?",
+    "Should amoxicillin be taken with food?",
+    "What happens if I miss a dose of levothyroxine?",
+]
+MEDICATIONS = [("Amoxicillin", "500mg", "Three times daily"), ("Metformin", "850mg", "Twice daily"),
+               ("Atorvastatin", "20mg", "Once daily at night"), ("Salbutamol", "100mcg", "As needed")]
+
+
+def _by_label(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No element labelled {label!r}")
+
+
+class SimulatedSession:
+    """One browser session, driven through AppTest"""
+
+    def __init__(self, rng, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = rng
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = []
+        self.exceptions = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.chat_replies = 0
+        self.chat_errors = 0
+
+    def rerun(self):
+        """Rerun the app, counting timeouts and harness errors instead of raising"""
+        started = time.perf_counter()
+        try:
+            self.app.run()
+        except Exception as exc:
+            # AppTest stops the script and raises RuntimeError when a rerun
+            # outlives its timeout; the session can carry on afterwards
+            if isinstance(exc, RuntimeError) and "timed out" in str(exc):
+                self.timeouts += 1
+            else:
+                self.failures += 1
+            return
+        self.latencies.append(time.perf_counter() - started)
+        if self.app.exception:
+            self.exceptions += 1
+
+    def start(self):
+        self.rerun()
+        self.app.sidebar.text_input[0].input("sk-ant-loadtest")
+        self.rerun()
+
+    def open(self, page):
+        self.app.sidebar.radio[0].set_value(PAGES[page])
+        self.rerun()
+
+    def home(self):
+        self.open("home")
+
+    def patients(self):
+        self.open("patients")
+
+    def chatbot(self):
+        self.open("chatbot")
+        self.app.chat_input[0].set_value(self.rng.choice(QUESTIONS))
+        self.rerun()
+        history = self.app.session_state["chat_history"]
+        if history and history[-1]["role"] == "assistant":
+            self.chat_replies += 1
+            # chat_with_claude turns failures (after SDK retries) into an "Error:" reply
+            if history[-1]["content"].startswith("Error:"):
+                self.chat_errors += 1
+
+    def generator(self):
+        self.open("generator")
+        name, dosage, frequency = self.rng.choice(MEDICATIONS)
+        _by_label(self.app.text_input, "💊 Medication Name").input(name)
+        _by_label(self.app.text_input, "📏 Dosage").input(dosage)
+        _by_label(self.app.text_input, "⏰ Frequency").input(frequency)
+        _by_label(self.app.button, "🎨 Generate QR Code").click()
+        self.rerun()
+
+    def survey(self):
+        self.open("survey")
+        for slider in self.app.slider:
+            slider.set_value(self.rng.randint(slider.min, slider.max))
+        _by_label(self.app.button, "Submit Survey").click()
+        self.rerun()
+
+    def analytics(self):
+        self.open("analytics")
+        buttons = [b for b in self.app.button if b.label == "Load Sample Data for Demo"]
+        if buttons:
+            buttons[0].click()
+            self.rerun()
+
+
+def rss_bytes():
+    """Current resident set size, falling back to the peak where /proc is absent"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def drive(session, mix, actions):
+    """Start ``session`` and visit ``actions`` pages drawn from the weighted ``mix``
+
+    An action that fails, e.g. because an app exception left its widgets
+    missing, counts as a failed rerun and the session moves on.
+    """
+    pages, weights = zip(*mix.items())
+    for action in ["start"] + session.rng.choices(pages, weights=weights, k=actions):
+        try:
+            getattr(session, action)()
+        except Exception:
+            session.failures += 1
+    return session
+
+
+_barrier = None
+
+
+def init_worker(barrier):
+    """Warm up the worker so one-off import costs are not charged to its session"""
+    global _barrier
+    _barrier = barrier
+    warnings.simplefilter("ignore", DeprecationWarning)
+    # Streamlit resets its own logger levels on every AppTest run, so mute
+    # its per-rerun deprecation warnings globally instead
+    logging.disable(logging.WARNING)
+
+    # Render the CPU-heavy pages once so lazy plotly/PIL initialisation happens here
+    warmup = SimulatedSession(random.Random(0), timeout=120)
+    warmup.start()
+    warmup.generator()
+    warmup.analytics()
+
+
+def run_session(seed, mix, actions, timeout):
+    """Drive one session in this worker and return its timings and memory growth"""
+    rss_before = rss_bytes()
+    session = SimulatedSession(random.Random(seed), timeout)
+    _barrier.wait()
+    started = time.time()
+    drive(session, mix, actions)
+    finished = time.time()
+    return {
+        "latencies": session.latencies,
+        "exceptions": session.exceptions,
+        "timeouts": session.timeouts,
+        "failures": session.failures,
+        "chat_replies": session.chat_replies,
+        "chat_errors": session.chat_errors,
+        "started": started,
+        "finished": finished,
+        "rss_bytes": max(0, rss_bytes() - rss_before),
+    }
@@ -0,0 +1,265 @@
+"""Lightweight instrumentation for the Smart Medication Education Platform.
+
+Streamlit re-executes QRcode.py on every rerun, so all metric state lives in
+this module (imported once per process) rather than in the script itself.
+
+Instrumentation is opt-in: set ``QRCODE_METRICS=1`` to enable it. When enabled,
+metrics are exported in Prometheus text format from
+``http://127.0.0.1:<QRCODE_METRICS_PORT>/metrics`` (default port 9464).
+When disabled, spans and counters are no-ops. Set ``QRCODE_METRICS_PANEL=1``
+as well to add a metrics panel to the sidebar. Run
+``benchmarks/metrics_overhead.py`` (with ``--panel`` to include the panel) to
+check the cost against the 1% overhead budget.
+"""
+import os
+import threading
+import time
+import warnings
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("QRCODE_METRICS", "").lower() in ("1", "true", "yes", "on")
+# The sidebar panel is opt-in on top of QRCODE_METRICS
+PANEL = os.environ.get("QRCODE_METRICS_PANEL", "").lower() in ("1", "true", "yes", "on")
+HOST = os.environ.get("QRCODE_METRICS_HOST", "127.0.0.1")
+DEFAULT_PORT = 9464
+
+# Latency buckets in seconds, tuned for both sub-millisecond helpers and
+# multi-second Claude API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_server = None
+
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        if not ENABLED:
+            return
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = {
+                    "counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0
+                }
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+# Metric registry
+span_seconds = Histogram("qrcode_span_duration_seconds", "Duration of instrumented code spans")
+reruns_total = Counter("qrcode_reruns_total", "Script reruns by page")
+cache_hits_total = Counter("qrcode_cache_hits_total", "Cache lookups served from cache")
+cache_misses_total = Counter("qrcode_cache_misses_total", "Cache lookups that had to compute")
+api_errors_total = Counter("qrcode_api_errors_total", "Failed Claude API calls by exception type")
+survey_writes_total = Counter("qrcode_survey_writes_total", "Survey responses recorded")
+REGISTRY = [span_seconds, reruns_total, cache_hits_total, cache_misses_total,
+            api_errors_total, survey_writes_total]
+
+
+class Span:
+    """Time a block of code and record it in ``span_seconds``.
+
+    Usable as a context manager, or via ``start()``/``stop()`` when the timed
+    region cannot be wrapped in a ``with`` block.
+    """
+
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.started = None
+
+    def start(self):
+        if ENABLED:
+            self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self.started is not None:
+            span_seconds.observe(time.perf_counter() - self.started, span=self.name, **self.labels)
+            self.started = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def span(name, **labels):
+    """Return a ``Span`` for use in a ``with`` statement"""
+    return Span(name, **labels)
+
+
+def timed(name=None):
+    """Decorator that records each call of the wrapped function as a span"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with Span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_prometheus():
+    """Render every registered metric in Prometheus text exposition format"""
+    with _lock:
+        lines = []
+        for metric in REGISTRY:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """Return per-span statistics as a list of dicts for display"""
+    rows = []
+    with _lock:
+        for key, series in sorted(span_seconds.values.items()):
+            labels = dict(key)
+            count = series["count"]
+            rows.append({
+                "span": labels.pop("span", ""),
+                "labels": ", ".join(f"{k}={v}" for k, v in labels.items()),
+                "count": count,
+                "mean_ms": round(series["sum"] / count * 1000, 3) if count else 0.0,
+                "total_s": round(series["sum"], 3),
+            })
+    return rows
+
+
+def counters():
+    """Return current counter values as a list of dicts for display"""
+    rows = []
+    with _lock:
+        for metric in REGISTRY:
+            if isinstance(metric, Counter):
+                for key, value in sorted(metric.values.items()):
+                    rows.append({
+                        "metric": metric.name,
+                        "labels": ", ".join(f"{k}={v}" for k, v in key),
+                        "value": value,
+                    })
+    return rows
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _port():
+    """Read ``QRCODE_METRICS_PORT``, falling back to ``DEFAULT_PORT`` with a warning"""
+    value = os.environ.get("QRCODE_METRICS_PORT", "").strip()
+    if not value:
+        return DEFAULT_PORT
+    try:
+        port = int(value)
+    except ValueError:
+        port = -1
+    if 0 <= port <= 65535:
+        return port
+    warnings.warn(f"Ignoring invalid QRCODE_METRICS_PORT={value!r}; using port {DEFAULT_PORT}")
+    return DEFAULT_PORT
+
+
+def start_server(host=HOST, port=None):
+    """Start the metrics endpoint once per process; return its URL or None.
+
+    Safe to call on every rerun. Returns None when instrumentation is disabled
+    or the port is already taken by another process. ``port`` defaults to
+    ``QRCODE_METRICS_PORT``, which is only read here, so a bad value cannot
+    break the app while metrics are off.
+    """
+    global _server
+    if not ENABLED:
+        return None
+    if port is None:
+        port = _port()
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None
+            thread = threading.Thread(target=_server.serve_forever, name="qrcode-metrics", daemon=True)
+            thread.start()
+        bound_host, bound_port = _server.server_address[:2]
+    return f"http://{bound_host}:{bound_port}/metrics"
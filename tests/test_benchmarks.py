@@ -0,0 +1,100 @@
+"""Tests for the regression gate in benchmarks/run_benchmarks.py."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import run_benchmarks  # noqa: E402
+from run_benchmarks import compare, noise_allowance  # noqa: E402
+
+# Median 1.0 s, absolute deviations 0, 0.5, 0.5, 0, 1.0 -> MAD 0.5, allowance 1.5 s
+SAMPLES = [1.0, 1.5, 0.5, 1.0, 2.0]
+
+
+def baseline(**entry):
+    return {"results": {"case/10": {"median_s": 1.0, "peak_memory_bytes": 1000, **entry}}}
+
+
+class NoiseAllowanceTest(unittest.TestCase):
+    def test_three_median_absolute_deviations(self):
+        self.assertEqual(noise_allowance(SAMPLES), 1.5)
+
+    def test_identical_samples_have_no_allowance(self):
+        self.assertEqual(noise_allowance([0.2] * 5), 0.0)
+
+    def test_missing_samples_have_no_allowance(self):
+        self.assertEqual(noise_allowance([]), 0.0)
+
+
+class CompareTest(unittest.TestCase):
+    def test_latency_limit_is_threshold_plus_noise_allowance(self):
+        # limit = 1.0 * 1.25 + 1.5 = 2.75 s
+        at_limit = {"case/10": {"median_s": 2.75, "peak_memory_bytes": 1000}}
+        over_limit = {"case/10": {"median_s": 2.875, "peak_memory_bytes": 1000}}
+        self.assertEqual(compare(at_limit, baseline(samples_s=SAMPLES), 0.25), [])
+        regressions = compare(over_limit, baseline(samples_s=SAMPLES), 0.25)
+        self.assertEqual([(key, kind) for key, kind, _ in regressions], [("case/10", "latency")])
+        self.assertIn("limit 2750.000 ms", regressions[0][2])
+
+    def test_baseline_without_samples_gates_on_threshold_alone(self):
+        self.assertEqual(compare({"case/10": {"median_s": 1.25}}, baseline(), 0.25), [])
+        regressions = compare({"case/10": {"median_s": 1.375}}, baseline(), 0.25)
+        self.assertEqual([kind for _, kind, _ in regressions], ["latency"])
+
+    def test_memory_limit_is_threshold_plus_page_noise(self):
+        # limit = 1000 * 1.25 + MEMORY_NOISE_BYTES
+        limit = 1250 + run_benchmarks.MEMORY_NOISE_BYTES
+        self.assertEqual(compare({"case/10": {"median_s": 1.0, "peak_memory_bytes": limit}},
+                                 baseline(samples_s=SAMPLES), 0.25), [])
+        regressions = compare({"case/10": {"median_s": 1.0, "peak_memory_bytes": limit + 1}},
+                              baseline(samples_s=SAMPLES), 0.25)
+        self.assertEqual([(key, kind) for key, kind, _ in regressions], [("case/10", "memory")])
+
+    def test_zero_memory_baseline_is_still_gated(self):
+        regressions = compare({"case/10": {"peak_memory_bytes": run_benchmarks.MEMORY_NOISE_BYTES + 1}},
+                              baseline(peak_memory_bytes=0), 0.25)
+        self.assertEqual([kind for _, kind, _ in regressions], ["memory"])
+
+    def test_cases_missing_from_the_baseline_are_skipped(self):
+        self.assertEqual(compare({"other/10": {"median_s": 99.0, "peak_memory_bytes": 10 ** 9}},
+                                 baseline(), 0.25), [])
+
+    def test_faster_and_smaller_is_not_a_regression(self):
+        self.assertEqual(compare({"case/10": {"median_s": 0.5, "peak_memory_bytes": 10}}, baseline(), 0.25), [])
+
+
+class EnvironmentDifferencesTest(unittest.TestCase):
+    def test_same_environment_has_no_differences(self):
+        current = run_benchmarks.environment()
+        recorded = dict(current, created="2000-01-01 00:00:00", platform="Other-kernel")
+        self.assertEqual(run_benchmarks.environment_differences(current, recorded), [])
+
+    def test_reports_changed_and_missing_fields(self):
+        current = run_benchmarks.environment()
+        recorded = dict(current, pandas="0.0.1")
+        del recorded["cpu"]
+        self.assertEqual(run_benchmarks.environment_differences(current, recorded),
+                         [("cpu", None, current["cpu"]), ("pandas", "0.0.1", current["pandas"])])
+
+
+class SummariseTest(unittest.TestCase):
+    def test_keeps_samples_for_the_noise_allowance(self):
+        result = run_benchmarks.summarise(10, 3, SAMPLES)
+        self.assertEqual(result["samples_s"], SAMPLES)
+        self.assertEqual(result["median_s"], 1.0)
+        self.assertEqual(result["repeats"], 5)
+        self.assertEqual(result["throughput_rows_per_s"], 10.0)
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/clear_refs"), "needs a resettable peak RSS counter")
+class PeakRssGrowthTest(unittest.TestCase):
+    def test_counts_memory_allocated_outside_the_python_heap(self):
+        # bytearray buffers are plain malloc, like Arrow and Pillow buffers
+        # after _release_free_memory(); 32 MiB is well above page noise
+        growth = run_benchmarks.peak_rss_growth(lambda: bytearray(32 * 1024 * 1024))
+        self.assertGreater(growth, 24 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
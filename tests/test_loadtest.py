@@ -0,0 +1,59 @@
+"""Tests for the load-test report helpers in loadtest/run_loadtest.py."""
+import argparse
+import math
+import os
+import random
+import sys
+import unittest
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "loadtest"))
+
+from run_loadtest import parse_mix, percentile  # noqa: E402
+
+
+def shuffled(n):
+    values = list(range(1, n + 1))
+    random.Random(n).shuffle(values)
+    return values
+
+
+class PercentileTest(unittest.TestCase):
+    def test_nearest_rank_for_20_samples(self):
+        values = shuffled(20)
+        self.assertEqual([percentile(values, pct) for pct in (50, 95, 99)], [10, 19, 20])
+
+    def test_nearest_rank_for_100_samples(self):
+        values = shuffled(100)
+        self.assertEqual([percentile(values, pct) for pct in (50, 95, 99)], [50, 95, 99])
+
+    def test_matches_exact_ranks_where_float_division_drifts(self):
+        # pct / 100 * n gives 7.000000000000001 here, i.e. rank 8
+        self.assertEqual(percentile(shuffled(25), 28), 7)
+        for n in (1, 7, 20, 25, 50, 100, 333):
+            values = shuffled(n)
+            for pct in range(1, 100):
+                with self.subTest(n=n, pct=pct):
+                    self.assertEqual(percentile(values, pct), math.ceil(Fraction(pct * n, 100)))
+
+    def test_extremes_and_empty_input(self):
+        values = shuffled(10)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 100), 10)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+class ParseMixTest(unittest.TestCase):
+    def test_weights_are_floats(self):
+        self.assertEqual(parse_mix("chatbot=4,survey=1.5"), {"chatbot": 4.0, "survey": 1.5})
+
+    def test_missing_weight_defaults_to_one_and_spaces_are_ignored(self):
+        self.assertEqual(parse_mix(" home , generator=2"), {"home": 1.0, "generator": 2.0})
+
+    def test_unknown_page_is_an_argparse_error(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix("chatbot=1,checkout=2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for the Prometheus exposition in metrics.py (stdlib only)."""
+import os
+import socket
+import subprocess
+import sys
+import unittest
+import urllib.request
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import metrics  # noqa: E402
+
+
+class EnabledTestCase(unittest.TestCase):
+    def setUp(self):
+        previous = metrics.ENABLED
+        metrics.ENABLED = True
+        self.addCleanup(setattr, metrics, "ENABLED", previous)
+
+
+class HistogramTest(EnabledTestCase):
+    def setUp(self):
+        super().setUp()
+        self.histogram = metrics.Histogram("test_seconds", "Test histogram", buckets=(0.1, 1.0))
+
+    def bucket_lines(self):
+        return [line for line in self.histogram.render() if "_bucket" in line]
+
+    def test_value_on_a_boundary_falls_in_that_bucket(self):
+        self.histogram.observe(0.1)
+        self.histogram.observe(1.0)
+        self.assertEqual(self.histogram.values[()]["counts"], [1, 1, 0])
+
+    def test_value_just_above_a_boundary_falls_in_the_next_bucket(self):
+        self.histogram.observe(0.1000001)
+        self.assertEqual(self.histogram.values[()]["counts"], [0, 1, 0])
+
+    def test_value_above_every_bound_counts_only_in_inf(self):
+        self.histogram.observe(5.0)
+        self.assertEqual(self.bucket_lines(), [
+            'test_seconds_bucket{le="0.1"} 0',
+            'test_seconds_bucket{le="1.0"} 0',
+            'test_seconds_bucket{le="+Inf"} 1',
+        ])
+
+    def test_bucket_counts_are_cumulative(self):
+        for value in (0.05, 0.5, 0.7, 2.0):
+            self.histogram.observe(value)
+        self.assertEqual(self.histogram.render(), [
+            "# HELP test_seconds Test histogram",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1.0"} 3',
+            'test_seconds_bucket{le="+Inf"} 4',
+            "test_seconds_sum 3.25",
+            "test_seconds_count 4",
+        ])
+
+    def test_labels_come_before_le(self):
+        self.histogram.observe(0.5, span="page", page="Home")
+        self.assertIn('test_seconds_bucket{page="Home",span="page",le="+Inf"} 1', self.bucket_lines())
+
+    def test_disabled_observe_records_nothing(self):
+        metrics.ENABLED = False
+        self.histogram.observe(0.5)
+        self.assertEqual(self.histogram.values, {})
+
+
+class LabelEscapingTest(EnabledTestCase):
+    def test_backslash_quote_and_newline_are_escaped(self):
+        self.assertEqual(metrics._escape('a\\b"c\nd'), 'a\\\\b\\"c\\nd')
+
+    def test_counter_renders_escaped_label_values(self):
+        counter = metrics.Counter("test_total", "Test counter")
+        counter.inc(error='Bad "key"\n')
+        self.assertEqual(counter.render()[-1], 'test_total{error="Bad \\"key\\"\\n"} 1')
+
+    def test_unlabelled_series_has_no_braces(self):
+        counter = metrics.Counter("test_total", "Test counter")
+        counter.inc(2)
+        self.assertEqual(counter.render()[-1], "test_total 2")
+
+
+class StartServerTest(EnabledTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self.stop_server)
+        self.stop_server()
+
+    @staticmethod
+    def stop_server():
+        if metrics._server is not None:
+            metrics._server.shutdown()
+            metrics._server.server_close()
+            metrics._server = None
+
+    def test_returns_none_when_the_port_is_taken(self):
+        with socket.socket() as taken:
+            taken.bind(("127.0.0.1", 0))
+            taken.listen()
+            port = taken.getsockname()[1]
+            self.assertIsNone(metrics.start_server("127.0.0.1", port))
+        self.assertIsNone(metrics._server)
+
+    def test_serves_metrics_and_starts_once(self):
+        url = metrics.start_server("127.0.0.1", 0)
+        self.assertEqual(metrics.start_server("127.0.0.1", 0), url)
+        with urllib.request.urlopen(url, timeout=5) as response:
+            self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+            body = response.read().decode("utf-8")
+        self.assertIn("# TYPE qrcode_span_duration_seconds histogram", body)
+
+    def test_returns_none_when_disabled(self):
+        metrics.ENABLED = False
+        self.assertIsNone(metrics.start_server("127.0.0.1", 0))
+
+    def test_port_is_read_from_the_environment(self):
+        with mock.patch.dict(os.environ, {"QRCODE_METRICS_PORT": "0"}):
+            self.assertIsNotNone(metrics.start_server("127.0.0.1"))
+        self.assertNotEqual(metrics._server.server_address[1], metrics.DEFAULT_PORT)
+
+
+class PortTest(unittest.TestCase):
+    def test_unset_port_uses_the_default(self):
+        with mock.patch.dict(os.environ, {"QRCODE_METRICS_PORT": ""}):
+            self.assertEqual(metrics._port(), metrics.DEFAULT_PORT)
+
+    def test_valid_port_is_used(self):
+        with mock.patch.dict(os.environ, {"QRCODE_METRICS_PORT": " 9500 "}):
+            self.assertEqual(metrics._port(), 9500)
+
+    def test_invalid_port_falls_back_with_a_warning(self):
+        for value in ("metrics", "70000", "-1"):
+            with self.subTest(value=value), mock.patch.dict(os.environ, {"QRCODE_METRICS_PORT": value}):
+                with self.assertWarns(UserWarning):
+                    self.assertEqual(metrics._port(), metrics.DEFAULT_PORT)
+
+    def test_invalid_port_does_not_break_import(self):
+        env = dict(os.environ, QRCODE_METRICS_PORT="not-a-port")
+        env.pop("QRCODE_METRICS", None)
+        subprocess.run([sys.executable, "-c", "import metrics"], cwd=ROOT, env=env, check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()